@@ -9,30 +9,27 @@ def ensure_tests_folder():
         os.makedirs('tests')
 
 def generate_sat_instance(num_variables, num_clauses, min_clause_length, max_clause_length, filename):
+    pool = range(1, num_variables + 1)
     clauses = []
     for _ in range(num_clauses):
         clause_length = random.randint(min_clause_length, max_clause_length)
-        clause = []
-        variables = random.sample(range(1, num_variables + 1), clause_length)
-        for var in variables:
-            clause.append(var if random.random() < 0.5 else -var)
-        clauses.append(clause)
+        clauses.append([var if random.random() < 0.5 else -var
+                        for var in random.sample(pool, clause_length)])
+
+    # format the instance once; minisat gets it on stdin, so no input
+    # temp file is written
+    header = f"p cnf {num_variables} {num_clauses}\n"
+    body = '\n'.join(' '.join(map(str, clause)) + ' 0' for clause in clauses) + '\n'
 
     filepath = os.path.join('tests', filename)
-    
-    # minisat input
-    with tempfile.NamedTemporaryFile(mode='w', delete=False) as temp_file:
-        temp_file.write(f"p cnf {num_variables} {num_clauses}\n")
-        for clause in clauses:
-            temp_file.write(' '.join(map(str, clause)) + ' 0\n')
-        temp_filename = temp_file.name
 
     # minisat output
     with tempfile.NamedTemporaryFile(mode='w', delete=False) as output_file:
         output_filename = output_file.name
 
     try:
-        result = subprocess.run(['minisat', temp_filename, output_filename], capture_output=True, text=True)
+        subprocess.run(['minisat', '/dev/stdin', output_filename],
+                       input=header + body, capture_output=True, text=True)
         with open(output_filename, 'r') as f:
             minisat_output = f.read()
         is_satisfiable = "UNSAT" not in minisat_output
@@ -43,17 +40,14 @@ def generate_sat_instance(num_variables, num_clauses, min_clause_length, max_cla
         print("Error: minisat not found. Please install minisat and ensure it's in your PATH.")
         return
     finally:
-        os.unlink(temp_filename)
         os.unlink(output_filename)
 
-    # write the file
+    # write the file in one shot
+    comments = f"c {'SATISFIABLE' if is_satisfiable else 'UNSATISFIABLE'}\n"
+    if is_satisfiable and solution:
+        comments += f"c Solution: {solution}\n"
     with open(filepath, 'w') as f:
-        f.write(f"c {'SATISFIABLE' if is_satisfiable else 'UNSATISFIABLE'}\n")
-        if is_satisfiable and solution:
-            f.write(f"c Solution: {solution}\n")
-        f.write(f"p cnf {num_variables} {num_clauses}\n")
-        for clause in clauses:
-            f.write(' '.join(map(str, clause)) + ' 0\n')
+        f.write(comments + header + body)
 
 def main():
     parser = argparse.ArgumentParser(description="Generate random SAT instances")
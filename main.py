@@ -1,255 +1,517 @@
 import sys
 from typing import List, Dict, Optional, Tuple, Set
+from array import array
 import heapq
 import time
 
-class Literal:
-    def __init__(self, variable: int, is_positive: bool):
-        self.variable = abs(variable)
-        self.is_positive = is_positive
+import numpy as np
 
-    def __neg__(self):
-        return Literal(self.variable, not self.is_positive)
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the kernels also run as plain Python
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        def wrap(function):
+            return function
+        return wrap
 
-    def __eq__(self, other):
-        return self.variable == other.variable and self.is_positive == other.is_positive
+# literals are packed ints: lit = variable << 1 | sign, sign 1 = positive
+# negation is lit ^ 1, variable is lit >> 1
 
-    def __hash__(self):
-        return hash((self.variable, self.is_positive))
+def make_literal(value: int) -> int:
+    return (abs(value) << 1) | (1 if value > 0 else 0)
 
-    def __str__(self):
-        return str(self.variable) if self.is_positive else f"-{self.variable}"
+def literal_to_dimacs(literal: int) -> int:
+    return literal >> 1 if literal & 1 else -(literal >> 1)
+
+def luby(i: int) -> int:
+    # i-th element (1-based) of the Luby sequence 1,1,2,1,1,2,4,1,1,2,...
+    while True:
+        k = i.bit_length()
+        if i == (1 << k) - 1:
+            return 1 << (k - 1)
+        i = i - (1 << (k - 1)) + 1
 
 class Clause:
-    def __init__(self, literals: List[Literal]):
-        self.literals = frozenset(literals)
-        self.watched = []
+    def __init__(self, literals: List[int]):
+        # positions 0 and 1 are the watched literals
+        self.literals = array('i', literals)
+        # activity and literal-block distance, used to rank learned clauses
+        # when the database is reduced
+        self.activity = 0.0
+        self.lbd = 0
+
+    def __len__(self):
+        return len(self.literals)
 
     def __str__(self):
-        return ' ∨ '.join(str(lit) for lit in sorted(self.literals, key=lambda l: l.variable))
+        return ' ∨ '.join(str(literal_to_dimacs(lit)) for lit in sorted(self.literals, key=lambda l: l >> 1))
 
 class Formula:
     def __init__(self, clauses: List[Clause]):
-        self.clauses = clauses
-        self.variable_to_clauses = {}
-        self.watches = {}
+        # canonical sorted literal tuple -> clause index, used to drop
+        # duplicate clauses here and at learn time
+        self.clause_set = {}
+        self.clauses = []
+        for clause in clauses:
+            key = tuple(sorted(clause.literals))
+            if key not in self.clause_set:
+                self.clause_set[key] = len(self.clauses)
+                self.clauses.append(clause)
+        clauses = self.clauses
+
+        # flat CSR copy of the clause literals for the numeric kernels:
+        # clause i occupies clause_lits[clause_start[i]:clause_start[i+1]]
+        self.clause_lits = array('i')
+        self.clause_start = array('i', [0])
+        for clause in clauses:
+            self.clause_lits.extend(clause.literals)
+            self.clause_start.append(len(self.clause_lits))
+
+        # variable -> clauses as a CSR pair instead of a dict of sets;
+        # clauses learned later go into the overflow dict
+        all_vars = np.frombuffer(self.clause_lits, dtype=np.int32) >> 1 if self.clause_lits else np.empty(0, dtype=np.int32)
+        self.num_vars = int(all_vars.max()) if all_vars.size else 0
+        counts = np.bincount(all_vars, minlength=self.num_vars + 1)
+        self.var_clause_offsets = np.zeros(self.num_vars + 2, dtype=np.int32)
+        np.cumsum(counts, out=self.var_clause_offsets[1:])
+        clause_ids = np.repeat(np.arange(len(clauses), dtype=np.int32),
+                               np.diff(np.frombuffer(self.clause_start, dtype=np.int32)))
+        self.var_clause_indices = clause_ids[np.argsort(all_vars, kind='stable')]
+        self.learned_occurrences = {}
+        # watchlists indexed by literal id; each entry packs
+        # clause_index << 32 | blocking_literal into a uint64
+        self.watches = [array('Q') for _ in range(2 * (self.num_vars + 1))]
         for i, clause in enumerate(clauses):
-            for literal in clause.literals:
-                if literal.variable not in self.variable_to_clauses:
-                    self.variable_to_clauses[literal.variable] = set()
-                self.variable_to_clauses[literal.variable].add(i)
-                
-                if literal not in self.watches:
-                    self.watches[literal] = set()
-                
-                if len(clause.watched) < 2:
-                    self.watches[literal].add(i)
-                    clause.watched.append(literal)
+            self.attach_clause(i)
+
+    def clauses_of_variable(self, variable: int) -> List[int]:
+        start = self.var_clause_offsets[variable]
+        end = self.var_clause_offsets[variable + 1]
+        indices = self.var_clause_indices[start:end].tolist()
+        indices.extend(self.learned_occurrences.get(variable, ()))
+        return indices
+
+    def attach_clause(self, clause_index: int):
+        literals = self.clauses[clause_index].literals
+        if len(literals) > 1:
+            self.watches[literals[0]].append(clause_index << 32 | literals[1])
+            self.watches[literals[1]].append(clause_index << 32 | literals[0])
+        else:
+            self.watches[literals[0]].append(clause_index << 32 | literals[0])
 
     def __str__(self):
         return ' ∧ '.join(f'({clause})' for clause in self.clauses)
 
+@njit(cache=True)
+def analyze_conflict_kernel(conflict_index, current_level, trail, assignment,
+                            decision_level, reasons, clause_lits, clause_start,
+                            seen, out):
+    # first-UIP walk over raw arrays; out[0] receives the asserting literal
+    count = 1
+    counter = 0
+    reason = conflict_index
+    uip_var = -1
+    index = len(trail)
+
+    while True:
+        for t in range(clause_start[reason], clause_start[reason + 1]):
+            literal = clause_lits[t]
+            var = literal >> 1
+            if var != uip_var and seen[var] == 0 and decision_level[var] > 0:
+                seen[var] = 1
+                if decision_level[var] == current_level:
+                    counter += 1
+                else:
+                    out[count] = literal
+                    count += 1
+
+        index -= 1
+        while seen[trail[index]] == 0:
+            index -= 1
+        uip_var = trail[index]
+        seen[uip_var] = 0
+        counter -= 1
+        if counter == 0:
+            break
+        reason = reasons[uip_var]
+
+    out[0] = (uip_var << 1) | (assignment[uip_var] ^ 1)
+    # clear the remaining touched seen bits so the buffer can be reused
+    # across conflicts without an O(num_vars) reset
+    backtrack_level = 0
+    for t in range(1, count):
+        var = out[t] >> 1
+        seen[var] = 0
+        level = decision_level[var]
+        if level > backtrack_level:
+            backtrack_level = level
+    return count, backtrack_level
+
 def parse_dimacs_file(file_path: str) -> Formula:
-    clauses = []
     with open(file_path, 'r') as file:
-        for line in file:
-            line = line.strip()
-            if line.startswith('c') or line.startswith('p'):
-                continue
-            literals = [Literal(int(x), int(x) > 0) for x in line.split()[:-1]]
-            clauses.append(Clause(literals))
+        body = ' '.join(line for line in file
+                        if line[:1] not in ('c', 'p', '\n', ''))
+    values = np.fromstring(body, dtype=np.int32, sep=' ')
+
+    # pack every literal in one vectorized pass, then split on the
+    # zero terminators
+    packed = (np.abs(values) << 1) | (values > 0)
+    clauses = []
+    start = 0
+    for end in np.flatnonzero(values == 0):
+        if end > start:
+            # sort and drop duplicate literals; a variable occurring with
+            # both signs then sits in adjacent slots differing in bit 0
+            literals = np.unique(packed[start:end])
+            if literals.size == 1 or not np.any((literals[:-1] ^ literals[1:]) == 1):
+                clauses.append(Clause(literals))
+        start = end + 1
     return Formula(clauses)
 
 class CDCLSolver:
     def __init__(self, formula: Formula):
         self.formula = formula
-        self.assignment = {}
-        self.decision_level = {var: 0 for var in formula.variable_to_clauses.keys()}
-        self.implication_graph = {}
+        self.num_vars = formula.num_vars
+        # indexed by variable id; assignment uses -1 = unassigned, 0/1 = value
+        self.assignment = array('b', [-1]) * (self.num_vars + 1)
+        self.decision_level = array('i', [0]) * (self.num_vars + 1)
+        # reason clause index per variable, -1 = decision or unassigned
+        self.implication_graph = array('i', [-1]) * (self.num_vars + 1)
+        # assignment order; trail_lim[i] is the trail length when level i+1 started
+        self.trail = array('i')
+        self.trail_lim = []
+        self.qhead = 0
         self.level = 0
-        self.variable_order = list(formula.variable_to_clauses.keys())
+        self.verbose = False
+        self.variable_order = [var for var in range(1, self.num_vars + 1)
+                               if formula.var_clause_offsets[var] < formula.var_clause_offsets[var + 1]]
+        # Luby restart schedule: restart after restart_limit * luby(k) conflicts
         self.restart_limit = 100
         self.restart_count = 0
+        self.conflicts_since_restart = 0
+        # learned-clause database reduction
+        self.num_original_clauses = len(formula.clauses)
+        self.learned_clauses = []
+        self.reduce_limit = 2000
+        self.clause_bump_amount = 1.0
+        self.clause_decay_factor = 0.999
+        # scratch buffers reused by analyze_conflict; the kernel clears the
+        # seen bits it sets before returning
+        self.seen = np.zeros(self.num_vars + 1, dtype=np.uint8)
+        self.analyze_out = np.empty(self.num_vars + 1, dtype=np.int32)
+        # last polarity each variable held before being unassigned, reused
+        # as the next decision polarity (phase saving); start optimistic
+        self.phase = bytearray(b'\x01') * (self.num_vars + 1)
+        self.initialize_jw_scores(formula.clauses)
+        self.vsids_scores = np.zeros(self.num_vars + 1)
+        self.vsids_decay_factor = 0.95
+        self.vsids_bump_amount = 1.0
+        self.vsids_heap = [(-0.0, var) for var in self.variable_order]
+        heapq.heapify(self.vsids_heap)
 
     def update_vsids_scores(self, clause):
+        scores = self.vsids_scores
+        heap = self.vsids_heap
+        bump = self.vsids_bump_amount
         for literal in clause:
-            self.vsids_scores[literal.variable] += self.vsids_bump_amount
-            for i, (score, var) in enumerate(self.vsids_heap):
-                if var == literal.variable:
-                    self.vsids_heap[i] = (self.vsids_scores[literal.variable], var)
-                    break
-        heapq.heapify(self.vsids_heap)
-        
-        # vsids decay
-        for var in self.vsids_scores:
-            self.vsids_scores[var] *= self.vsids_decay_factor
+            variable = literal >> 1
+            scores[variable] += bump
+            heapq.heappush(heap, (-scores[variable], variable))
 
+        # decay all scores by growing the bump instead of touching every score
         self.vsids_bump_amount /= self.vsids_decay_factor
+        if self.vsids_bump_amount > 1e100:
+            self.vsids_scores *= 1e-100
+            self.vsids_bump_amount *= 1e-100
+            self.vsids_heap = [(-self.vsids_scores[var], var) for var in self.variable_order
+                               if self.assignment[var] == -1]
+            heapq.heapify(self.vsids_heap)
 
     def get_next_decision_variable(self):
         while self.vsids_heap:
-            _, var = heapq.heappop(self.vsids_heap)
-            if var not in self.assignment:
+            neg_score, var = heapq.heappop(self.vsids_heap)
+            # skip assigned variables and entries made stale by later bumps
+            if self.assignment[var] == -1 and -neg_score == self.vsids_scores[var]:
                 return var
         return None
 
     def initialize_jw_scores(self, clauses):
-        self.jw_scores.clear()
+        self.jw_scores = np.zeros(self.num_vars + 1)
         for clause in clauses:
-            weight = 2 ** -len(clause)
-            for literal in clause:
-                self.jw_scores[abs(literal)] += weight
+            variables = np.frombuffer(clause.literals, dtype=np.int32) >> 1
+            np.add.at(self.jw_scores, variables, 2.0 ** -len(clause))
 
     def update_jw_scores(self, learned_clause):
-        weight = 2 ** -len(learned_clause)
-        for literal in learned_clause:
-            self.jw_scores[abs(literal)] += weight
+        variables = np.frombuffer(learned_clause.literals, dtype=np.int32) >> 1
+        np.add.at(self.jw_scores, variables, 2.0 ** -len(learned_clause))
 
     def get_next_decision_variable_jw(self):
-        unassigned_vars = [var for var in self.jw_scores if var not in self.assignment]
-        if not unassigned_vars:
+        assigned = np.frombuffer(self.assignment, dtype=np.int8) != -1
+        assigned[0] = True  # variable ids start at 1
+        scores = np.where(assigned, -np.inf, self.jw_scores)
+        var = int(np.argmax(scores))
+        if scores[var] == -np.inf:
             return None
-        return max(unassigned_vars, key=lambda var: self.jw_scores[var])
-
-    def unit_propagation(self) -> Optional[Clause]:
-        propagation_queue = [(var, val) for var, val in self.assignment.items()]
-        while propagation_queue:
-            variable, value = propagation_queue.pop(0)
-            print(f"Propagating: {variable} = {value}")
-            
-            literal = Literal(variable, not value)
-            for clause_index in self.formula.watches.get(literal, set()).copy():
-                clause = self.formula.clauses[clause_index]
-                
-                other_watch = next(lit for lit in clause.watched if lit != literal)
-                
+        return var
+
+    def unit_propagation(self) -> Optional[int]:
+        # bind the hot attributes once; every lookup below runs per literal
+        assignment = self.assignment
+        decision_level = self.decision_level
+        implication_graph = self.implication_graph
+        watches = self.formula.watches
+        clauses = self.formula.clauses
+        trail = self.trail
+        level = self.level
+
+        while self.qhead < len(trail):
+            variable = trail[self.qhead]
+            self.qhead += 1
+            value = assignment[variable]
+            if self.verbose:
+                print(f"Propagating: {variable} = {value}")
+
+            # the literal falsified by this assignment
+            false_literal = (variable << 1) | (value ^ 1)
+            watch_list = watches[false_literal]
+            conflict = None
+            i = j = 0
+            end = len(watch_list)
+            while i < end:
+                entry = watch_list[i]
+                i += 1
+
+                # blocking literal: skip the clause body entirely if it is true
+                blocker = entry & 0xFFFFFFFF
+                if assignment[blocker >> 1] == (blocker & 1):
+                    watch_list[j] = entry
+                    j += 1
+                    continue
+
+                clause_index = entry >> 32
+                clause = clauses[clause_index]
+                literals = clause.literals
+
+                # keep the falsified watch at position 1
+                if len(literals) > 1 and literals[0] == false_literal:
+                    literals[0], literals[1] = literals[1], literals[0]
+                other_watch = literals[0]
+
                 # clause alrdy satisfied
-                if other_watch.variable in self.assignment and self.assignment[other_watch.variable] == other_watch.is_positive:
-                    continue  
-                
-                new_watch = None
-                for lit in clause.literals:
-                    if lit not in clause.watched and (lit.variable not in self.assignment or self.assignment[lit.variable] == lit.is_positive):
-                        new_watch = lit
+                if assignment[other_watch >> 1] == (other_watch & 1):
+                    watch_list[j] = clause_index << 32 | other_watch
+                    j += 1
+                    continue
+
+                # look for a non-false replacement watch
+                for k in range(2, len(literals)):
+                    lit = literals[k]
+                    if assignment[lit >> 1] != (lit & 1) ^ 1:
+                        literals[1], literals[k] = literals[k], literals[1]
+                        watches[lit].append(clause_index << 32 | other_watch)
                         break
-                
-                if new_watch:
-                    clause.watched.remove(literal)
-                    clause.watched.append(new_watch)
-                    self.formula.watches[literal].remove(clause_index)
-                    if new_watch not in self.formula.watches:
-                        self.formula.watches[new_watch] = set()
-                    self.formula.watches[new_watch].add(clause_index)
                 else:
-                    if other_watch.variable not in self.assignment:
-                        self.assignment[other_watch.variable] = other_watch.is_positive
-                        self.decision_level[other_watch.variable] = self.level
-                        self.implication_graph[other_watch.variable] = clause
-                        propagation_queue.append((other_watch.variable, other_watch.is_positive))
-                        print(f"Unit propagation: {other_watch.variable} = {other_watch.is_positive}")
-                    elif self.assignment[other_watch.variable] != other_watch.is_positive:
-                        print(f"Conflict found: {clause}")
-                        return clause
-        
+                    # no replacement: clause is unit on other_watch, or in conflict
+                    watch_list[j] = clause_index << 32 | other_watch
+                    j += 1
+                    other_variable = other_watch >> 1
+                    other_value = other_watch & 1
+                    if assignment[other_variable] == -1:
+                        assignment[other_variable] = other_value
+                        decision_level[other_variable] = level
+                        implication_graph[other_variable] = clause_index
+                        trail.append(other_variable)
+                        if self.verbose:
+                            print(f"Unit propagation: {other_variable} = {other_value}")
+                    else:
+                        if self.verbose:
+                            print(f"Conflict found: {clause}")
+                        conflict = clause_index
+                        while i < end:
+                            watch_list[j] = watch_list[i]
+                            j += 1
+                            i += 1
+            if j < end:
+                del watch_list[j:]
+            if conflict is not None:
+                return conflict
+
         return None
 
     def backtrack(self, level: int):
-        for var, assigned_level in list(self.decision_level.items()):
-            if assigned_level > level:
-                del self.assignment[var]
-                del self.decision_level[var]
-                if var in self.implication_graph:
-                    del self.implication_graph[var]
+        if level < self.level:
+            while len(self.trail) > self.trail_lim[level]:
+                var = self.trail.pop()
+                self.phase[var] = self.assignment[var]
+                self.assignment[var] = -1
+                self.decision_level[var] = 0
+                self.implication_graph[var] = -1
+                heapq.heappush(self.vsids_heap, (-self.vsids_scores[var], var))
+            del self.trail_lim[level:]
+            self.qhead = min(self.qhead, len(self.trail))
         self.level = level
 
-    def analyze_conflict(self, conflict_clause: Clause) -> Tuple[Clause, int]:
-        learned_clause = set(conflict_clause.literals)
-        current_level_literals = set()
-        seen = set()
-        
-        while True:
-            for literal in learned_clause:
-                if literal.variable not in seen:
-                    seen.add(literal.variable)
-                    level = self.decision_level.get(literal.variable, 0)
-                    if level == self.level:
-                        current_level_literals.add(literal)
-                    elif level > 0:
-                        learned_clause.add(-Literal(literal.variable, not literal.is_positive))
-            
-            if len(current_level_literals) <= 1:
-                break
-            
-            literal = current_level_literals.pop()
-            learned_clause.remove(literal)
-            if literal.variable in self.implication_graph:
-                antecedent = self.implication_graph[literal.variable]
-                learned_clause.update(antecedent.literals)
-        
-        backtrack_level = 0
-        for literal in learned_clause:
-            level = self.decision_level.get(literal.variable, 0)
-            if level != self.level and level > backtrack_level:
-                backtrack_level = level
-        
-        return Clause(list(learned_clause)), backtrack_level
-    
+    def reduce_clause_database(self):
+        # called at level 0: drop the worst half of the learned clauses
+        # (high LBD, low activity), keeping binary clauses and clauses
+        # currently used as reasons, then rebuild the derived structures
+        formula = self.formula
+        reasons = {self.implication_graph[var] for var in self.trail
+                   if self.implication_graph[var] >= 0}
+        candidates = sorted(self.learned_clauses,
+                            key=lambda ci: (formula.clauses[ci].lbd, -formula.clauses[ci].activity))
+        keep_count = len(candidates) // 2
+        kept = sorted(ci for position, ci in enumerate(candidates)
+                      if position < keep_count or ci in reasons
+                      or len(formula.clauses[ci]) <= 2)
+
+        remap = {}
+        new_clauses = formula.clauses[:self.num_original_clauses]
+        for ci in kept:
+            remap[ci] = len(new_clauses)
+            new_clauses.append(formula.clauses[ci])
+        formula.clauses = new_clauses
+
+        # flat literal arrays: truncate the learned tail and re-append
+        del formula.clause_lits[formula.clause_start[self.num_original_clauses]:]
+        del formula.clause_start[self.num_original_clauses + 1:]
+        for clause in new_clauses[self.num_original_clauses:]:
+            formula.clause_lits.extend(clause.literals)
+            formula.clause_start.append(len(formula.clause_lits))
+
+        formula.clause_set = {key: remap.get(ci, ci) for key, ci in formula.clause_set.items()
+                              if ci < self.num_original_clauses or ci in remap}
+
+        formula.learned_occurrences = {}
+        for index in range(self.num_original_clauses, len(new_clauses)):
+            for literal in new_clauses[index].literals:
+                formula.learned_occurrences.setdefault(literal >> 1, []).append(index)
+
+        formula.watches = [array('Q') for _ in range(2 * (formula.num_vars + 1))]
+        for index in range(len(new_clauses)):
+            formula.attach_clause(index)
+
+        for var in self.trail:
+            reason = self.implication_graph[var]
+            if reason >= self.num_original_clauses:
+                self.implication_graph[var] = remap[reason]
+
+        self.learned_clauses = list(range(self.num_original_clauses, len(new_clauses)))
+
+    def analyze_conflict(self, conflict_index: int) -> Tuple[Clause, int]:
+        # first-UIP scheme: walk the trail backwards, resolving away
+        # current-level literals until a single one (the UIP) remains;
+        # the heavy lifting happens in the jitted kernel
+        out = self.analyze_out
+        count, backtrack_level = analyze_conflict_kernel(
+            conflict_index, self.level,
+            np.frombuffer(self.trail, dtype=np.int32),
+            np.frombuffer(self.assignment, dtype=np.int8),
+            np.frombuffer(self.decision_level, dtype=np.int32),
+            np.frombuffer(self.implication_graph, dtype=np.int32),
+            np.frombuffer(self.formula.clause_lits, dtype=np.int32),
+            np.frombuffer(self.formula.clause_start, dtype=np.int32),
+            self.seen, out)
+
+        return Clause(out[:count]), backtrack_level
+
     def solve(self) -> Optional[Dict[int, bool]]:
         while True:
-            self.restart_count += 1
-            if self.restart_count > self.restart_limit:
-                self.restart_count = 0
-                self.backtrack(0)
-                print("Restarting solver")
             conflict = self.unit_propagation()
-            print(f"Level: {self.level}, Assignment: {self.assignment}")
-            print(f"Conflict: {conflict}")
-            
+            if self.verbose:
+                print(f"Level: {self.level}, Assignment: {self.assignment}")
+            if self.verbose:
+                print(f"Conflict: {conflict}")
+
             if conflict is None:
-                if len(self.assignment) == len(self.variable_order):
-                    return self.assignment
-                
+                if len(self.trail) == len(self.variable_order):
+                    return {var: bool(self.assignment[var]) for var in self.variable_order}
+
+                if self.conflicts_since_restart >= self.restart_limit * luby(self.restart_count + 1):
+                    self.restart_count += 1
+                    self.conflicts_since_restart = 0
+                    self.backtrack(0)
+                    if len(self.learned_clauses) > self.reduce_limit:
+                        self.reduce_clause_database()
+                    if self.verbose:
+                        print("Restarting solver")
+                    continue
+
                 self.level += 1
-                for var in self.variable_order:
-                    if var not in self.assignment:
-                        self.assignment[var] = True
-                        self.decision_level[var] = self.level
-                        print(f"Decision: Assigning {var} = True at level {self.level}")
-                        break
+                self.trail_lim.append(len(self.trail))
+                var = self.get_next_decision_variable()
+                if var is None:
+                    var = next(v for v in self.variable_order if self.assignment[v] == -1)
+                self.assignment[var] = self.phase[var]
+                self.decision_level[var] = self.level
+                self.trail.append(var)
+                if self.verbose:
+                    print(f"Decision: Assigning {var} = {self.phase[var]} at level {self.level}")
             else:
                 if self.level == 0:
                     return None
-                
+
+                self.conflicts_since_restart += 1
                 learned_clause, backtrack_level = self.analyze_conflict(conflict)
-                print(f"Learned clause: {learned_clause}, Backtrack level: {backtrack_level}")
-                self.formula.clauses.append(learned_clause)
-                
-                # initialize watched literals
-                learned_clause.watched = []
-                for literal in learned_clause.literals:
-                    if literal.variable not in self.formula.variable_to_clauses:
-                        self.formula.variable_to_clauses[literal.variable] = set()
-                    self.formula.variable_to_clauses[literal.variable].add(len(self.formula.clauses) - 1)
-                    if literal.variable not in self.decision_level:
-                        self.decision_level[literal.variable] = 0
-                    
-                    if len(learned_clause.watched) < 2:
-                        if literal not in self.formula.watches:
-                            self.formula.watches[literal] = set()
-                        self.formula.watches[literal].add(len(self.formula.clauses) - 1)
-                        learned_clause.watched.append(literal)
-                
-                self.backtrack(backtrack_level)
-                print(f"Backtracked to level {backtrack_level}")
-                
-                # unit propafation for learned clause
-                for literal in learned_clause.literals:
-                    if literal.variable not in self.assignment:
-                        self.assignment[literal.variable] = literal.is_positive
-                        self.decision_level[literal.variable] = backtrack_level
-                        self.implication_graph[literal.variable] = learned_clause
-                        print(f"Unit propagation from learned clause: {literal.variable} = {literal.is_positive}")
-                        break
+                self.update_vsids_scores(learned_clause.literals)
+                if self.verbose:
+                    print(f"Learned clause: {learned_clause}, Backtrack level: {backtrack_level}")
+                asserting = learned_clause.literals[0]
+                learned_clause.lbd = len({self.decision_level[lit >> 1]
+                                          for lit in learned_clause.literals})
+
+                key = tuple(sorted(learned_clause.literals))
+                clause_index = self.formula.clause_set.get(key)
+                if clause_index is not None:
+                    # already learned (or an original clause): reuse it as the
+                    # reason instead of growing the database and watchlists
+                    learned_clause = self.formula.clauses[clause_index]
+                    self.backtrack(backtrack_level)
+                    if self.verbose:
+                        print(f"Backtracked to level {backtrack_level}")
+                else:
+                    self.formula.clauses.append(learned_clause)
+                    clause_index = len(self.formula.clauses) - 1
+                    self.formula.clause_set[key] = clause_index
+                    self.learned_clauses.append(clause_index)
+
+                    for literal in learned_clause.literals:
+                        variable = literal >> 1
+                        self.formula.learned_occurrences.setdefault(variable, []).append(clause_index)
+
+                    self.backtrack(backtrack_level)
+                    if self.verbose:
+                        print(f"Backtracked to level {backtrack_level}")
+
+                    # initialize watched literals: prefer non-false literals,
+                    # then the most recently assigned, so the watch invariant
+                    # holds after backtracking
+                    learned_clause.literals[:] = array('i', sorted(
+                        learned_clause.literals,
+                        key=lambda lit: (self.assignment[lit >> 1] == (lit & 1) ^ 1,
+                                         -self.decision_level[lit >> 1])))
+                    self.formula.clause_lits.extend(learned_clause.literals)
+                    self.formula.clause_start.append(len(self.formula.clause_lits))
+                    self.formula.attach_clause(clause_index)
+
+                learned_clause.activity += self.clause_bump_amount
+                self.clause_bump_amount /= self.clause_decay_factor
+                if self.clause_bump_amount > 1e20:
+                    for ci in self.learned_clauses:
+                        self.formula.clauses[ci].activity *= 1e-20
+                    self.clause_bump_amount *= 1e-20
+
+                # the learned clause is asserting: its UIP literal is the only
+                # one unassigned after backtracking
+                variable = asserting >> 1
+                self.assignment[variable] = asserting & 1
+                self.decision_level[variable] = backtrack_level
+                self.implication_graph[variable] = clause_index
+                self.trail.append(variable)
+                if self.verbose:
+                    print(f"Unit propagation from learned clause: {variable} = {asserting & 1}")
 
 def solve_sat(file_path: str) -> Optional[Dict[int, bool]]:
     formula = parse_dimacs_file(file_path)
@@ -262,21 +524,21 @@ def solve_sat(file_path: str) -> Optional[Dict[int, bool]]:
 
 def main():
     dimacs_file = "test.cnf"
-    
+
     start_time = time.time()
-    
+
     solution = solve_sat(dimacs_file)
-    
+
     end_time = time.time()
-    solve_time = end_time - start_time 
+    solve_time = end_time - start_time
 
     if solution:
         print("SAT")
         print("Solution:", " ".join(f"{k if v else -k}" for k, v in sorted(solution.items())))
     else:
         print("UNSAT")
-    
+
     print(f"Solving time: {solve_time:.4f} seconds")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()